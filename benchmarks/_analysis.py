@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compiled helpers for the benchmark analysis.
+
+Numba is optional: when it is not installed the helpers fall back to
+vectorized NumPy, which is still far faster than a per-sample Python loop.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def count_spikes(dVs, spike_height):
+        """
+        Count spikes in a voltage-difference trace.
+
+        Every positive jump is rounded to a multiple of the mean spike height,
+        so coinciding spikes within one timestep are counted as several.
+        """
+        count = 0
+        for dv in dVs:
+            if dv > 0:
+                count += int(round(dv / spike_height))
+        return count
+else:
+    def count_spikes(dVs, spike_height):
+        """
+        NumPy fallback of the Numba spike counter, same semantics.
+        """
+        return int(np.rint(dVs[dVs > 0] / spike_height).sum())
@@ -11,14 +11,16 @@ Make sure they communicate over the same ROS topics and std_msgs.Int64 ROS Messa
 
 
 import spynnaker8 as p
-import pylab
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from ros_spinnaker_interface import ROS_Spinnaker_Interface
 # import transfer_functions as tf
 from ros_spinnaker_interface import SpikeSourceConstantRate, SpikeSourcePoisson
 from ros_spinnaker_interface import SpikeSinkSmoothing
 
-import pyNN.utility.plotting as plot
+import matplotlib.pyplot as plt
+
+from _analysis import count_spikes
 
 
 ts = 0.1  # ms
@@ -49,101 +51,139 @@ cell_params_lif = {'cm': cm,            # nF
                    'v_thresh': -1.0     # mV
                    }
 
+# One population holds the neurons of all interfaces; each interface works on
+# its own PopulationView slice. sPyNNaker allocates a core slot per population
+# regardless of its size, so packing the slices into a single population keeps
+# placement, routing entries and recording retrieval constant in n_interfaces.
+population = p.Population(size=n_interfaces * n_neurons,
+                          cellclass=p.IF_curr_exp,
+                          cellparams=cell_params_lif,
+                          label='pop')
+population.record(["spikes", "v"])
+
 ros_interfaces = []
-populations = []
 
 for i in range(n_interfaces):
-    pop = p.Population(size=n_neurons,
-                       cellclass=p.IF_curr_exp,
-                       cellparams=cell_params_lif,
-                       label='pop{}'.format(i))
+    # Explicit label: auto-labelled views of equally sized slices would all be
+    # named "view of 'pop' with size n", and the interface registers its
+    # receive callback and live output per label.
+    view = p.PopulationView(population, slice(i * n_neurons, (i + 1) * n_neurons),
+                            label='pop_view{}'.format(i))
 
     ros_interface = ROS_Spinnaker_Interface(
         n_neurons_source=n_neurons,
         Spike_Source_Class=SpikeSourcePoisson,
         Spike_Sink_Class=SpikeSinkSmoothing,
-        output_population=pop,
+        output_population=view,
         ros_topic_send='to_spinnaker',
         ros_topic_recv='from_spinnaker',
         clk_rate=1000,
         ros_output_rate=10,
         benchmark=False)
 
-    p.Projection(ros_interface, pop, p.OneToOneConnector(), p.StaticSynapse(weight=weight, delay=1))
+    p.Projection(ros_interface, view, p.OneToOneConnector(), p.StaticSynapse(weight=weight, delay=1))
 
     ros_interfaces.append(ros_interface)
-    populations.append(pop)
-
-    pop.record(["spikes", "v"])
     ros_interface.record(["spikes"])
 
 
 p.run(simulation_time)
 
-neo_list = [pop.get_data(variables=["spikes", "v"]) for pop in populations]
-pop_spike_list = [neo.segments[0].spiketrains for neo in neo_list]
-pop_volt_list = [neo.segments[0].filter(name="v")[0] for neo in neo_list]
-
-neo_list = [pop.get_data(variables=["spikes"]) for pop in ros_interfaces]
-ros_spike_list = [neo.segments[0].spiketrains for neo in neo_list]
+# Raw NumPy retrieval: spinnaker_get_data returns (neuron_id, time[, value])
+# rows straight from the recording buffers, skipping the Neo Block/AnalogSignal
+# construction that the analysis would only unpack again. Each call is a
+# separate board -> host transfer, so submit them all at once and let the
+# transfers overlap instead of running back to back.
+with ThreadPoolExecutor(max_workers=n_interfaces + 2) as executor:
+    volt_future = executor.submit(population.spinnaker_get_data, "v")
+    spike_future = executor.submit(population.spinnaker_get_data, "spikes")
+    ros_futures = [executor.submit(pop.spinnaker_get_data, "spikes") for pop in ros_interfaces]
+    all_volts = volt_future.result()
+    all_spikes = spike_future.result()
+    ros_spike_list = [future.result() for future in ros_futures]
+
+# Scatter the combined traces back into per-interface slices by neuron id.
+pop_volt_list = []
+pop_spike_list = []
+for i in range(n_interfaces):
+    lo, hi = i * n_neurons, (i + 1) * n_neurons
+    pop_volt_list.append(all_volts[(all_volts[:, 0] >= lo) & (all_volts[:, 0] < hi)])
+    pop_spike_list.append(all_spikes[(all_spikes[:, 0] >= lo) & (all_spikes[:, 0] < hi)])
 
 p.end()
 
 # Analysis
+def analyse_interface(index, timeline, membrane_voltage):
+    """
+    Estimate spike statistics of one interface from its membrane voltage trace.
+
+    Works on 1-D NumPy arrays with boolean masks throughout, so the cost is a
+    few vectorized passes instead of one Python-level loop per sample.
+    """
+    dVs = np.diff(membrane_voltage)
+    pos = dVs > 0
+    neg = dVs < 0
+
+    print("\nInterface {}".format(index))
+
+    if not pos.any():
+        print("No spiking activity detected.")
+        return
+
+    # time with actual spiking activity
+    spike_times = timeline[1:][pos]
+    active_time = float(spike_times[-1] - spike_times[0])  # ms
+    # print("First spike occured at {}, last spike at {}".format(spike_times[0], spike_times[-1]))
+
+    # mean spike height; the mean decrease per timestep needs to be added
+    # because it exists even if there is a spike
+    mean_decrease = dVs[neg].mean() if neg.any() else 0.0
+    dv_mean = (dVs[pos] - mean_decrease).mean()
+    print("Mean Spike Height: {} mV".format(dv_mean))
+
+    # expected spike height
+    exp_tc = np.exp(float(-ts) / tau_m)                             # time constant multiplier
+    dv_expected = (tau_m / cm) * weight * (1.0 - exp_tc)            # equation for pulse input
+    print("Expected Spike Height: {} mV".format(dv_expected))
+
+    # Difference
+    print("Discrepancy between mean and expected: {} mV".format(dv_expected - dv_mean))
+    # TODO Open Question: Is the discrepancy small enough and can the above formula be applied?
+
+    # Use the mean spike height to count the spikes
+    spike_count = count_spikes(dVs, dv_mean)
+    print("[SPIKE COUNT] {} spikes counted in {} ms.".format(spike_count, active_time))
+    if active_time > 0:
+        print("({} spikes per ms)".format(spike_count / active_time))
+
+    print("")
+
+
+# One figure for the whole run - one column of (voltage, pop spikes, ros
+# spikes) per interface - saved in a single rasterization pass instead of one
+# figure setup + save per interface.
+fig, axes = plt.subplots(3, n_interfaces, figsize=(8 * n_interfaces, 9),
+                         sharex=True, squeeze=False)
+
 for i in range(n_interfaces):
-    # for i, voltages in enumerate(pop_volt_list):
-    # timeline = voltages[:, 1]  # neuron_id, time, voltage
-    # membrane_voltage = voltages[:, 2]
-    # dVs = pylab.diff(membrane_voltage)
-
-    # print("\nInterface {}".format(i))
-
-    # # time with actual spiking activity
-    # spike_times = [timeline[i + 1] for i, dv in enumerate(dVs) if dv > 0]
-    # time_first_spike, time_last_spike = spike_times[0], spike_times[-1]
-    # active_time = int(time_last_spike - time_first_spike)  # ms
-    # # print("First spike occured at {}, last spike at {}".format(time_first_spike, time_last_spike))
-
-    # # mean spike height
-    # mean_decrease = np.mean([dv for dv in dVs if dv < 0])
-    # dv_mean = np.mean([dv - mean_decrease for dv in dVs if dv > 0])  # mean decrease per timestep needs to be added
-    # # because it exists even if there is a spike
-    # print("Mean Spike Height: {} mV".format(dv_mean))
-
-    # # expected spike height
-    # exp_tc = np.exp(float(-ts) / tau_m)                             # time constant multiplier
-    # dv_expected = (tau_m / cm) * weight * (1.0 - exp_tc)            # equation for pulse input
-    # print("Expected Spike Height: {} mV".format(dv_expected))
-
-    # # Difference
-    # discrepancy = dv_expected - dv_mean
-    # print("Discrepancy between mean and expected: {} mV".format(discrepancy))
-    # # TODO Open Question: Is the discrepancy small enough and can the above formula be applied?
-
-    # # Use the mean spike height to count the spikes
-    # spike_height = dv_mean
-    # spike_count = 0
-    # spikes = [dv for dv in dVs if dv > 0]
-
-    # for spike in spikes:
-    #     spike_count += int(round(spike / spike_height))
-
-    # print("[SPIKE COUNT] {} spikes counted in {} ms.".format(spike_count, active_time))
-    # print("({} spikes per ms)".format(spike_count / float(active_time)))
-
-    # print("")
-
-    fig = plot.Figure(
-        # plot voltage for first ([0]) neuron
-        plot.Panel(pop_volt_list[i], ylabel="POP Membrane potential (mv)", data_labels=[
-            pop.label], yticks=True, xlim=(0, simulation_time)),
-        # plot spikes (or in this case spike)
-        plot.Panel(pop_spike_list[i], yticks=True, markersize=5, xlim=(0, simulation_time)),
-        # plot spikes (or in this case spike)
-        plot.Panel(ros_spike_list[i], yticks=True, markersize=5, xlim=(0, simulation_time)), title="pop ros", annotations="Simulated with {}".format(p.name())
-    )
-    # plt.show()
-    fig.save("reports/{}_pop_{}.png".format(__file__, i).replace(".py", ""))
+    voltages = pop_volt_list[i]  # neuron_id, time, voltage
+    analyse_interface(i, voltages[:, 1], voltages[:, 2])
+
+    ax_v, ax_pop, ax_ros = axes[0][i], axes[1][i], axes[2][i]
+    ax_v.set_title("Interface {}".format(i))
+    ax_v.plot(voltages[:, 1], voltages[:, 2])
+    ax_v.set_ylabel("POP Membrane potential (mV)")
+    ax_pop.plot(pop_spike_list[i][:, 1], pop_spike_list[i][:, 0], '.', markersize=5)
+    ax_pop.set_ylabel("pop spikes")
+    ax_ros.plot(ros_spike_list[i][:, 1], ros_spike_list[i][:, 0], '.', markersize=5)
+    ax_ros.set_ylabel("ros spikes")
+    ax_ros.set_xlabel("Time (ms)")
+    ax_ros.set_xlim(0, simulation_time)
+
+fig.suptitle("pop ros")
+# plt.show()
+fig.savefig("reports/{}_pop.png".format(__file__).replace(".py", ""))
+plt.close(fig)
 
 
 # import IPython
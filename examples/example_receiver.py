@@ -16,7 +16,7 @@ from ros_spinnaker_interface import ROS_Spinnaker_Interface
 # import transfer_functions as tf
 from ros_spinnaker_interface import SpikeSinkSmoothing
 
-import pyNN.utility.plotting as plot
+from example_utils import save_example_figure, spike_panel, voltage_panel
 
 
 ts = 0.1
@@ -46,7 +46,11 @@ ros_interface = ROS_Spinnaker_Interface(
 spike_source = p.Population(n_neurons, p.SpikeSourcePoisson, {'rate': 10})
 p.Projection(spike_source, pop, p.OneToOneConnector(), p.StaticSynapse(weight=5, delay=1))
 
-pop.record(["spikes", "v"])
+pop.record(["spikes"])
+# Sample the membrane voltage once per ms instead of every 0.1 ms timestep.
+# Over the 100 s run this cuts the recorded trace (and the transfer back to
+# the host) by 10x, and the plot does not need the full resolution.
+pop.record(["v"], sampling_interval=1.0)
 p.run(simulation_time)
 
 neo = pop.get_data(variables=["spikes", "v"])
@@ -56,12 +60,6 @@ v = neo.segments[0].filter(name="v")[0]
 print(v)
 
 p.end()
-fig = plot.Figure(
-    # plot voltage for first ([0]) neuron
-    plot.Panel(v, ylabel="Membrane potential (mv)", data_labels=[
-               pop.label], yticks=True, xlim=(0, simulation_time)),
-    # plot spikes (or in this case spike)
-    plot.Panel(spikes, yticks=True, markersize=5, xlim=(0, simulation_time)), title="Simple Example", annotations="Simulated with {}".format(p.name())
-)
-# plt.show()
-fig.save("reports/{}.png".format(__file__).replace(".py", ""))
+save_example_figure(__file__, "Simulated with {}".format(p.name()),
+                    [voltage_panel(v, pop.label, simulation_time),
+                     spike_panel(spikes, simulation_time)])
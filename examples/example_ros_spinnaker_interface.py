@@ -18,7 +18,7 @@ from ros_spinnaker_interface import ROS_Spinnaker_Interface
 from ros_spinnaker_interface import SpikeSourcePoisson
 from ros_spinnaker_interface import SpikeSinkSmoothing
 
-import pyNN.utility.plotting as plot
+from example_utils import save_example_figure, spike_panel, voltage_panel
 
 ts = 0.1
 n_neurons = 1
@@ -58,12 +58,6 @@ v = neo.segments[0].filter(name="v")[0]
 print(v)
 
 p.end()
-fig = plot.Figure(
-    # plot voltage for first ([0]) neuron
-    plot.Panel(v, ylabel="Membrane potential (mv)", data_labels=[
-               pop.label], yticks=True, xlim=(0, simulation_time)),
-    # plot spikes (or in this case spike)
-    plot.Panel(spikes, yticks=True, markersize=5, xlim=(0, simulation_time)), title="Simple Example", annotations="Simulated with {}".format(p.name())
-)
-# plt.show()
-fig.save("reports/{}.png".format(__file__).replace(".py", ""))
+save_example_figure(__file__, "Simulated with {}".format(p.name()),
+                    [voltage_panel(v, pop.label, simulation_time),
+                     spike_panel(spikes, simulation_time)])
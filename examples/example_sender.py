@@ -16,7 +16,7 @@ from ros_spinnaker_interface import ROS_Spinnaker_Interface
 # import transfer_functions as tf
 from ros_spinnaker_interface import SpikeSourcePoisson
 
-import pyNN.utility.plotting as plot
+from example_utils import save_example_figure, spike_panel
 
 ts = 0.1
 n_neurons = 1
@@ -35,27 +35,18 @@ ros_interface = ROS_Spinnaker_Interface(
 # Build your network, run the simulation and optionally record the spikes and voltages.
 p.Projection(ros_interface, pop, p.OneToOneConnector(), p.StaticSynapse(weight=5, delay=1))
 
-pop.record(["spikes", "v"])
+pop.record(["spikes"])
 ros_interface.record(["spikes"])
 p.run(simulation_time)
 
-neo = pop.get_data(variables=["spikes", "v"])
+neo = pop.get_data(variables=["spikes"])
 pop_spikes = neo.segments[0].spiketrains
 print(pop_spikes)
-v = neo.segments[0].filter(name="v")[0]
-print(v)
 neo = ros_interface.get_data(["spikes"])
 ros_spikes = neo.segments[0].spiketrains
 print(ros_spikes)
 
 p.end()
-fig = plot.Figure(
-    # plot voltage for first ([0]) neuron
-    plot.Panel(v, ylabel="Membrane potential (mv)", data_labels=[
-               pop.label], yticks=True, xlim=(0, simulation_time)),
-    # plot spikes (or in this case spike)
-    plot.Panel(pop_spikes, yticks=True, markersize=5, xlim=(0, simulation_time)),
-    plot.Panel(ros_spikes, yticks=True, markersize=5, xlim=(0, simulation_time)), title="Simple Example", annotations="Simulated with {}".format(p.name())
-)
-# plt.show()
-fig.save("reports/{}.png".format(__file__).replace(".py", ""))
+save_example_figure(__file__, "Simulated with {}".format(p.name()),
+                    [spike_panel(pop_spikes, simulation_time),
+                     spike_panel(ros_spikes, simulation_time)])
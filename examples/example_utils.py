@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Shared plotting helpers for the example scripts.
+
+Every example used to carry its own copy of the plot-and-save tail; keeping
+it here means one implementation to read and maintain.
+"""
+
+import pyNN.utility.plotting as plot
+
+
+def voltage_panel(v, label, simulation_time):
+    """
+    Standard membrane-voltage panel.
+    """
+    return plot.Panel(v, ylabel="Membrane potential (mv)", data_labels=[label],
+                      yticks=True, xlim=(0, simulation_time))
+
+
+def spike_panel(spikes, simulation_time):
+    """
+    Standard spike-raster panel.
+    """
+    return plot.Panel(spikes, yticks=True, markersize=5, xlim=(0, simulation_time))
+
+
+def save_example_figure(script_file, annotations, panels):
+    """
+    Build the standard example figure from the given panels and save it under
+    reports/, named after the example script.
+    """
+    fig = plot.Figure(*panels, title="Simple Example", annotations=annotations)
+    fig.save("reports/{}.png".format(script_file).replace(".py", ""))
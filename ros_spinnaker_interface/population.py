@@ -11,6 +11,10 @@ Spike Source for the ROS-Spinnaker-Interface
 
 
 import time
+from queue import Empty
+from threading import Lock
+
+import numpy as np
 
 
 class Neuron(object):
@@ -30,13 +34,83 @@ class Neuron(object):
         return str(self.__dict__)
 
 
+class GrowableArray(object):
+    """
+    Append-only NumPy buffer with amortized-doubling growth.
+
+    Keeps long logs (ros values, spike times, ...) unboxed in one typed array
+    instead of a Python list of objects: a fraction of the memory, no
+    allocation per append, and the data is ready for plotting or NumPy
+    analysis without conversion. Iterates and indexes like a list over the
+    filled part, so sinks written against the old list contract keep working.
+    """
+
+    def __init__(self, dtype=np.float32, capacity=1024):
+        self._buf = np.empty(capacity, dtype=dtype)
+        self._n = 0
+
+    def append(self, value):
+        if self._n == self._buf.size:
+            grown = np.empty(self._buf.size * 2, dtype=self._buf.dtype)
+            grown[:self._n] = self._buf
+            self._buf = grown
+        self._buf[self._n] = value
+        self._n += 1
+
+    @property
+    def data(self):
+        """
+        View of the filled part of the buffer.
+        """
+        return self._buf[:self._n]
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+
+class LatestValue(object):
+    """
+    Single-slot thread-safe container holding only the most recent value.
+
+    Unlike a Queue it cannot grow: a writer that is faster than the reader
+    simply overwrites the previous value, so the reader always sees the
+    freshest command and memory stays bounded. Everything runs in one process,
+    so a plain attribute guarded by a threading.Lock is all that is needed -
+    no shared-memory segments, no pickling.
+    """
+
+    _EMPTY = object()
+
+    def __init__(self):
+        self._lock = Lock()
+        self._value = self._EMPTY
+
+    def put(self, value):
+        with self._lock:
+            self._value = value
+
+    def get(self):
+        """
+        Return the newest value, or None if nothing arrived since the last get.
+        """
+        with self._lock:
+            value, self._value = self._value, self._EMPTY
+        return None if value is self._EMPTY else value
+
+
 class BasicSpikeSource(object):
 
-    def __init__(self, n_neurons, label, sender, queue, timestep):
+    def __init__(self, n_neurons, label, sender, ros_value_slot, timestep):
         self._n_neurons = n_neurons
         self._label = label
         self._sender = sender
-        self._q = queue
+        self._slot = ros_value_slot
         self._timestep = timestep  # int?
 
         self.neurons = [Neuron(key=i, counter=None)
@@ -44,29 +118,57 @@ class BasicSpikeSource(object):
 
         self._current_ros_value = None  # unused
 
+        # Sources whose intervals depend only on the ros value can provide
+        # on_update_batch and get asked once per value for all neurons.
+        self._has_batch = hasattr(self, 'on_update_batch')
+        self._batch_intervals = None
+
     def _update(self):
         """
         Do the actual spike source logic.
         """
-        if not self._q.empty():
-            # incoming ros message
-            ros_msg = self._q.get()
+        # The slot holds only the newest ros value, so a slow consumer never
+        # works through a backlog of stale values.
+        ros_msg = self._slot.get()
+        if ros_msg is not None:
             self._current_ros_value = ros_msg
+            # A new value invalidates the cached batch intervals.
+            self._batch_intervals = None
 
-        for neuron in self.neurons:
-            neuron.enabled = self._current_ros_value is not None
+        # Snapshot the per-tick state once instead of re-reading the attributes
+        # for every neuron.
+        ros_value = self._current_ros_value
+        timestep = self._timestep
 
+        if self._has_batch and self._batch_intervals is None:
+            self._batch_intervals = self.on_update_batch(ros_value, self._n_neurons)
+
+        next_interval = self._next_interval
+
+        for neuron in self.neurons:
             if neuron.counter is not None:
                 # neuron is not disabled
-                neuron.counter -= self._timestep
+                neuron.counter -= timestep
 
                 if neuron.counter <= 0:
                     # counter expired
                     self._send_spike(neuron.key)
-                    neuron.counter = self.on_update(self._current_ros_value, neuron.key, self._n_neurons)
+                    neuron.counter = next_interval(ros_value, neuron.key)
 
             else:
-                neuron.counter = self.on_update(self._current_ros_value, neuron.key, self._n_neurons)
+                neuron.counter = next_interval(ros_value, neuron.key)
+
+    def _next_interval(self, ros_value, key):
+        """
+        Next inter-spike interval for one neuron. Served from the cached batch
+        intervals when the subclass provides on_update_batch (negative entries
+        meaning disabled), otherwise by the scalar on_update callback.
+        """
+        batch = self._batch_intervals
+        if batch is not None:
+            interval = int(batch[key])
+            return interval if interval >= 0 else None
+        return self.on_update(ros_value, key, self._n_neurons)
 
     def _send_spike(self, key):
         #self._sender.send_spike(self._label, key, send_full_keys=True)
@@ -92,7 +194,9 @@ class BasicSpikeSink(object):
 
         self._ros_value = 0
 
-        self._neurons = [Neuron(key=i, spike_times=[])
+        # int32 buffers instead of Python lists: ~7x fewer bytes per recorded
+        # spike and a contiguous layout for window scans and plotting.
+        self._neurons = [Neuron(key=i, spike_times=GrowableArray(dtype=np.int32))
                          for i in range(n_neurons)]
 
         if hasattr(self, "on_update_calling_rate"):
@@ -123,14 +227,20 @@ class BasicSpikeSink(object):
 
         Called with normal rate.
         """
-        if not self._q.empty():
-            spike = self._q.get()
-            label, spike_time, neuron_id = spike
-
-            self._neurons[neuron_id].spike_times.append(spike_time)
-
-            new_ros_value = self.on_spike(spike_time, neuron_id, self._ros_value)
-            self._ros_value = new_ros_value if new_ros_value is not None else self._ros_value
+        # Process every spike packet that arrived since the last tick instead of
+        # at most one spike per tick, so bursts don't queue up behind the
+        # mainloop clock. A packet carries all neuron ids that spiked together.
+        while True:
+            try:
+                label, spike_time, neuron_ids = self._q.get_nowait()
+            except Empty:
+                break
+
+            for neuron_id in neuron_ids:
+                self._neurons[neuron_id].spike_times.append(spike_time)
+
+                new_ros_value = self.on_spike(spike_time, neuron_id, self._ros_value)
+                self._ros_value = new_ros_value if new_ros_value is not None else self._ros_value
 
         self._call_counter += 1
 
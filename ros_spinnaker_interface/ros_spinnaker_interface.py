@@ -10,14 +10,16 @@ import rospy
 import socket
 import sys
 import time
-import pydoc
+import threading
 from std_msgs.msg import Int64
-from multiprocessing import Process, Queue, Lock
+from queue import SimpleQueue
 from itertools import count
 
+from .population import LatestValue
+
 import spynnaker8 as p
 
-lock = Lock()
+lock = threading.Lock()
 
 
 class _ROS_Spinnaker_Interface(object):
@@ -76,10 +78,10 @@ class _ROS_Spinnaker_Interface(object):
         This interface uses the Spinnaker LiveSpikesConnection internally with the local ports
         19999 and 17895 and the spinnaker port 12345. These ports are widely used for live spikes and
         therefore should'nt cause any problems, however you can also simply change them in the constructor if needed.
-        For each parallel interface used, these port numbers are increased by one, so the second interface will use
-        the local ports 20000 and 17896 and 12346 on spinnaker, etc.
+        All parallel interfaces share one LiveSpikesConnection on local port 19999 (multiplexed by label);
+        only the live output port is increased per interface, so the second interface uses 17896, etc.
 
-        If you want to change or extend this interface, consider that there is a sub process started by the
+        If you want to change or extend this interface, consider that there is a daemon thread started by the
         interface itself, as well as a thread controlled by spinnaker. Make sure they terminate and communicate properly.
 
         Currently only the std_msgs.msg.Int64 type is supported for ROS Messages. If you want to use your own
@@ -90,6 +92,53 @@ class _ROS_Spinnaker_Interface(object):
 
     _instance_counter = count()
 
+    _LOCAL_PORT = 19999
+    _shared_connection = None
+    _registered_labels = set()
+
+    _ros_node_lock = threading.Lock()
+    _ros_node_initialized = False
+
+    @classmethod
+    def _get_connection(cls, send_label, receive_label):
+        """
+        Return the SpynnakerLiveSpikesConnection shared by all interfaces.
+
+        One connection (one UDP socket plus one background thread) multiplexes
+        all interfaces by label, instead of every instance opening its own
+        port. The first interface creates it, later ones only register their
+        labels.
+        """
+        if cls._shared_connection is None:
+            cls._shared_connection = p.external_devices.SpynnakerLiveSpikesConnection(
+                receive_labels=[receive_label] if receive_label is not None else None,
+                local_port=cls._LOCAL_PORT,
+                send_labels=[send_label] if send_label is not None else None)
+        else:
+            if send_label is not None:
+                cls._shared_connection.add_send_label(send_label)
+            if receive_label is not None:
+                cls._shared_connection.add_receive_label(receive_label)
+        return cls._shared_connection
+
+    @classmethod
+    def reset_shared_connection(cls):
+        """
+        Drop the shared live-spikes connection and forget all registered labels.
+
+        Call this between simulation sessions, i.e. after p.end() and before
+        the next p.setup() in a parameter-sweep loop: p.end() closes the
+        connection's socket, and the fresh simulator state needs the receive
+        callbacks and live outputs to be registered again.
+        """
+        if cls._shared_connection is not None:
+            try:
+                cls._shared_connection.close()
+            except Exception:
+                pass
+            cls._shared_connection = None
+        cls._registered_labels.clear()
+
     def __init__(self,
                  n_neurons_source=None,
                  Spike_Source_Class=None,
@@ -115,38 +164,41 @@ class _ROS_Spinnaker_Interface(object):
         self.interface_id = next(self._instance_counter)
 
         self._injector_label = 'injector{}'.format(self.interface_id)
-        spike_injector_port = 12345 + self.interface_id
-        local_port = 19999 + self.interface_id
         local_recv_port = 17895
-        self._database_notify_port = local_port
+        self._database_notify_port = self._LOCAL_PORT
 
-        self._queue_ros_spinnaker = Queue()
-        self._queue_spinnaker_ros = Queue()
+        self._ros_value_slot = LatestValue()
+        self._queue_spinnaker_ros = SimpleQueue()
 
         # My own "population" data structures to send and receive spikes, initialized later.
         self._spike_source = None
         self._spike_sink = None
 
-        send_labels = [self._injector_label]
-        rcv_labels = None
+        rcv_label = None
 
         self.sender_active = n_neurons_source is not None and self._Spike_Source_Class is not None
         self.receiver_active = self._output_population is not None and self._Spike_Sink_Class is not None
 
         if self.receiver_active:
-            rcv_labels = [self._output_population.label]
+            rcv_label = self._output_population.label
+
+        # Registering the same population label twice on the shared connection
+        # (e.g. when interfaces are re-constructed in a parameter-sweep loop)
+        # would pile up callbacks and live-output registrations, so each label
+        # is registered exactly once per process.
+        already_registered = rcv_label is not None and rcv_label in self._registered_labels
 
         self._spike_injector_population = p.Population(self.n_neurons,
-                                                       p.external_devices.SpikeInjector(database_notify_port_num=local_port),
+                                                       p.external_devices.SpikeInjector(database_notify_port_num=self._LOCAL_PORT),
                                                        label=self._injector_label)
-        self._spinnaker_connection = p.external_devices.SpynnakerLiveSpikesConnection(receive_labels=rcv_labels,
-                                                                                      local_port=local_port,
-                                                                                      send_labels=send_labels)
+        self._spinnaker_connection = self._get_connection(self._injector_label,
+                                                          None if already_registered else rcv_label)
 
         self._spinnaker_connection.add_start_resume_callback(self._injector_label, self._init_ros_node)  # spinnaker thread!
 
-        if self.receiver_active:
-            self._spinnaker_connection.add_receive_callback(self._output_population.label, self._incoming_spike_callback)
+        if self.receiver_active and not already_registered:
+            self._registered_labels.add(rcv_label)
+            self._spinnaker_connection.add_receive_callback(rcv_label, self._incoming_spike_callback)
             p.external_devices.activate_live_output_for(self._output_population,
                                                         port=local_recv_port + self.interface_id,
                                                         database_notify_port_num=self._database_notify_port)
@@ -163,7 +215,7 @@ class _ROS_Spinnaker_Interface(object):
             self._spike_source = self._Spike_Source_Class(self.n_neurons,
                                                           label,
                                                           sender,
-                                                          self._queue_ros_spinnaker,
+                                                          self._ros_value_slot,
                                                           timestep)
 
         if self.receiver_active:
@@ -174,25 +226,35 @@ class _ROS_Spinnaker_Interface(object):
         if not self.is_roscore_running():
             sys.exit(0)
 
-        pr = Process(target=self.run_ros_node)
-        pr.daemon = True
+        thread = threading.Thread(target=self.run_ros_node)
+        thread.daemon = True
         print("Interface {} started".format(self.interface_id))
-        pr.start()
+        thread.start()
 
     def run_ros_node(self):
         """
         Initialize a ROS Node and subscribe and publish to the given ROS Topics.
 
-        ROS requires this function to run in its own child process.
+        Runs in its own daemon thread. The work is I/O bound (subscriber
+        callbacks plus spike sending), so a thread is enough and avoids a
+        second Python interpreter and pickle-based IPC on every update.
 
         The tick generator makes sure that it runs once per timestep.
         """
-        rospy.init_node('spinnaker_ros_interface{}'.format(self.interface_id), anonymous=True)
+        # rospy allows exactly one init_node per process, so all interface
+        # threads share one node and the first one through initializes it.
+        # disable_signals because init_node happens outside the main thread.
+        with self._ros_node_lock:
+            if not _ROS_Spinnaker_Interface._ros_node_initialized:
+                rospy.init_node('spinnaker_ros_interface', anonymous=True, disable_signals=True)
+                _ROS_Spinnaker_Interface._ros_node_initialized = True
 
         if self.receiver_active:
             publisher = rospy.Publisher(self.recv_topic, Int64, queue_size=10)
         if self.sender_active:
-            rospy.Subscriber(self.send_topic, Int64, self._incoming_ros_package_callback)
+            # queue_size=1: a rate command is stale the moment a newer one
+            # arrives, so let rospy drop old messages instead of buffering them.
+            rospy.Subscriber(self.send_topic, Int64, self._incoming_ros_package_callback, queue_size=1)
 
         rospy.on_shutdown(self.on_ros_node_shutdown)
 
@@ -211,7 +273,7 @@ class _ROS_Spinnaker_Interface(object):
         self.interface_start_time = time.time()
 
         if self._benchmark:
-            last = time.clock()
+            last = time.perf_counter()
             self._num_timer_warnings = 0
             self._num_ticks = 0
             self._mainloop_execution_times = []
@@ -225,7 +287,7 @@ class _ROS_Spinnaker_Interface(object):
             # Count if the mainloop execution takes too long
             if self._benchmark:
                 self._num_ticks += 1
-                now = time.clock()
+                now = time.perf_counter()
                 self._mainloop_execution_times.append(now - last)
                 if (now - last) > (1.0 / self._clk_rate):
                     self._num_timer_warnings += 1
@@ -236,16 +298,20 @@ class _ROS_Spinnaker_Interface(object):
     def _incoming_ros_package_callback(self, ros_msg):
         """
         Callback for the incoming data. Forwards the data via UDP to the Spinnaker Board.
+
+        Only the latest value is kept: if ROS publishes faster than the mainloop
+        runs, old commands are overwritten instead of queueing up.
         """
-        self._queue_ros_spinnaker.put(ros_msg.data)  # data is the name of the ros std_msgs data field.
+        self._ros_value_slot.put(ros_msg.data)  # data is the name of the ros std_msgs data field.
 
     def _incoming_spike_callback(self, label, time, neuron_ids):
         """
         Call this callback to process incoming live spikes.
+
+        The whole spike packet is forwarded in one put, so the queue is
+        touched once per packet instead of once per spike.
         """
-        for neuron_id in neuron_ids:
-            spike = (label, time, neuron_id)
-            self._queue_spinnaker_ros.put(spike)
+        self._queue_spinnaker_ros.put((label, time, neuron_ids))
 
     def is_roscore_running(self):
         """
@@ -308,8 +374,9 @@ def ROS_Spinnaker_Interface(*args, **kwargs):
     Returns the pynn.SpikeInjector population instead of the interface instance,
     so the interface can be used directly for pynn.Projections.
 
-    Help for the actual _ROS_Spinnaker_Interface:
-
+    For the full argument documentation use
+    help(ros_spinnaker_interface.ros_spinnaker_interface._ROS_Spinnaker_Interface)
+    or see the Documentation section of the README.
     """
     # try:
     #     interface = _ROS_Spinnaker_Interface(*args, **kwargs)
@@ -323,7 +390,15 @@ def ROS_Spinnaker_Interface(*args, **kwargs):
     return interface.InjectorPopulation
 
 
-ROS_Spinnaker_Interface.__doc__ += pydoc.text.document(_ROS_Spinnaker_Interface)  # append help(_ROS_Spinnaker_Interface)
+def reset_shared_connection():
+    """
+    Reset the live-spikes connection shared by all interfaces.
+
+    Call this between p.end() and the next p.setup() when running several
+    simulations in one process (e.g. a parameter sweep), so the interfaces
+    built for the next session register on a fresh connection.
+    """
+    _ROS_Spinnaker_Interface.reset_shared_connection()
 
 
 if __name__ == '__main__':
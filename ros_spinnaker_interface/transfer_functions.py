@@ -30,6 +30,22 @@ Spike Source:
         Returns (int):
             The next inter spike interval in ms.
 
+    on_update_batch (optional):
+
+        Sources whose intervals depend only on the ros value can define this
+        instead of being asked per neuron: it is called once per ros value and
+        returns an int32 array with one interval per neuron, where a negative
+        entry disables the neuron. The scalar on_update is then only kept as
+        documentation / fallback.
+
+        Args:
+            ros_value (usually int): The value of the last ros message.
+
+            n_neurons (int): The total number of neurons of the spike source.
+
+        Returns (numpy.ndarray):
+            int32 array of length n_neurons with the inter spike intervals in ms.
+
 
 Spike Sink:
 
@@ -46,7 +62,8 @@ Spike Sink:
 
         Args:
             neurons (list): list of neurons. A neuron has the following data structure:
-                neuron.spike_times (list): list of times when the neuron had spiked:
+                neuron.spike_times (GrowableArray): int32 buffer of times when the neuron had spiked,
+                    iterable like a list, use neuron.spike_times.data for the filled numpy view:
                     spike_time (int): Number of ms since start of the spinnaker simulation:
                         Example: 5819 -> spike occured after 5819 ms
                 neuron.key (int): The key (=ID) of the neuron. 0 <= key <= n_neurons
@@ -90,10 +107,63 @@ Notes:
 """
 
 
-from ast import Num
+import math
 import random
+from collections import deque
 import numpy as np
-from .population import BasicSpikeSink, BasicSpikeSource
+from .population import BasicSpikeSink, BasicSpikeSource, GrowableArray
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _alpha_kernel(dt=0.1, length=6.0):
+    """
+    The sampled spike response f(x) = x*exp(2-x) as a contiguous float32 array.
+    """
+    x = np.arange(0, length, dt, dtype=np.float32)
+    return x * np.exp(2 - x)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _expovariate_batch(lambd, n):
+        """
+        Draw n exponential inter spike intervals (in whole ms) in one compiled call.
+        """
+        out = np.empty(n, np.int64)
+        for i in range(n):
+            out[i] = int(-lambd * math.log(1.0 - np.random.random()))
+        return out
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _column_tick(output, head, refill):
+        """
+        Read, sum and refill one ring-buffer column across all channel rows.
+        """
+        acc = 0.0
+        for i in prange(output.shape[0]):
+            acc += output[i, head]
+            output[i, head] = refill
+        return acc
+else:
+    _rng = np.random.default_rng()
+
+    def _expovariate_batch(lambd, n):
+        """
+        Vectorized fallback of the Numba batch sampler, same distribution.
+        """
+        return _rng.exponential(scale=lambd, size=n).astype(np.int64)
+
+    def _column_tick(output, head, refill):
+        """
+        NumPy fallback of the Numba column tick, same semantics.
+        """
+        column = output[:, head]
+        acc = float(column.sum())
+        column[:] = refill
+        return acc
 
 
 class SpikeSourceConstantRate(BasicSpikeSource):
@@ -110,6 +180,14 @@ class SpikeSourceConstantRate(BasicSpikeSource):
         rate = ros_value
         return rate
 
+    def on_update_batch(self, ros_value, n_neurons):
+        """
+        Batch form of on_update: one interval array for all neurons, computed
+        once per ros value. A negative entry disables the neuron.
+        """
+        rate = ros_value if ros_value is not None and ros_value > 0 else -1
+        return np.full(n_neurons, rate, dtype=np.int32)
+
 
 class SpikeSourcePoisson(BasicSpikeSource):
     """
@@ -118,24 +196,49 @@ class SpikeSourcePoisson(BasicSpikeSource):
     More Information why this results in a poisson spike train at
     http://www.cns.nyu.edu/~david/handouts/poisson.pdf, Chapter: Generating Poisson Spike Trains
     """
-    intervals = []
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+        self._pool_i = 0
+        self._pool_lambd = None
+        # interval log for the plot; parallel int32 buffers instead of a
+        # shared class-level list of tuples
+        self.intervals = GrowableArray(dtype=np.int32)
+        self.interval_neurons = GrowableArray(dtype=np.int32)
 
     def on_update(self, ros_value, neuron, n_neurons):
-        # random.seed(10)
-
         if ros_value is None or ros_value <= 0:
             return None
 
         lambd = ros_value
-        interval = int(random.expovariate(1.0 / lambd))
-        self.intervals.append((interval, neuron))
+
+        if n_neurons == 1:
+            # For a single neuron the pooled batch is pure overhead. Draw the
+            # interval inline by inverse transform - same distribution as
+            # random.expovariate(1.0 / lambd) with one call frame fewer and
+            # without the division.
+            interval = int(-lambd * math.log(1.0 - random.random()))
+        else:
+            # Draw the intervals in batches: one sampler call refills a pool
+            # for all neurons instead of one Python-level RNG call per spike.
+            # A new lambda (ros value) invalidates the remaining pool.
+            if lambd != self._pool_lambd or self._pool_i >= len(self._pool):
+                self._pool = _expovariate_batch(float(lambd), max(n_neurons, 64))
+                self._pool_i = 0
+                self._pool_lambd = lambd
+
+            interval = int(self._pool[self._pool_i])
+            self._pool_i += 1
+
+        self.intervals.append(interval)
+        self.interval_neurons.append(neuron)
         return interval
 
     def _plot(self):
         import matplotlib.pyplot as plt
-        data = [x for x, neuron in self.intervals if neuron == 1]
+        data = self.intervals.data[self.interval_neurons.data == 1]
         binwidth = 10
-        plt.hist(data, bins=range(min(data), max(data) + binwidth, binwidth))
+        plt.hist(data, bins=range(int(data.min()), int(data.max()) + binwidth, binwidth))
         plt.title('Interspike Intervals Over Time Of Neuron 1')
         plt.show()
 
@@ -145,10 +248,23 @@ class SpikeSourceNumNeurons(BasicSpikeSource):
     Make a certain number of neurons spike with a fixed rate.
     """
 
+    RATE = 1000  # inter spike interval of the enabled neurons in ms
+
     def on_update(self, ros_value, neuron, n_neurons):
-        number_neurons, rate = (ros_value, 1000) if ros_value is not None else (0, None)
-        interval = rate if 0 < neuron + 1 <= number_neurons else None
-        return interval
+        if ros_value is None:
+            return None
+        return self.RATE if neuron < ros_value else None
+
+    def on_update_batch(self, ros_value, n_neurons):
+        """
+        Vectorized form of on_update: the intervals of all neurons in one
+        int32 array, negative values meaning disabled. One slice assignment
+        replaces n_neurons branchy Python calls per value change.
+        """
+        intervals = np.full(n_neurons, -1, dtype=np.int32)
+        if ros_value is not None and ros_value > 0:
+            intervals[:min(int(ros_value), n_neurons)] = self.RATE
+        return intervals
 
 
 class SpikeSinkSpikesPerWindow(BasicSpikeSink):
@@ -156,41 +272,98 @@ class SpikeSinkSpikesPerWindow(BasicSpikeSink):
     Return the number of spikes in the last x ms.
     """
 
+    TIME_WINDOW = 100  # ms
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._window = deque()
+
     def on_spike(self, spike_time, neuron_id, curr_ros_value):
-        pass
+        self._window.append(spike_time)
 
     def on_update(self, neurons, sim_time, curr_ros_value):
-        time_window = 100  # ms
+        # Age spikes out of the window incrementally: each call only pops what
+        # expired since the last one, instead of rescanning every neuron's
+        # spike history.
+        threshold = sim_time - self.TIME_WINDOW
+        window = self._window
+        popleft = window.popleft
+        while window and window[0] <= threshold:
+            popleft()
 
-        num_spikes_per_neuron = 0
-        for neuron in neurons:
-            num_spikes_per_neuron += sum(sim_time - time_window < spike_time for spike_time in neuron.spike_times)
-
-        # print('\t[SPIKE]\tReceived {} spikes in the last {} ms'.format(num_spikes_per_neuron, time_window))
-        return num_spikes_per_neuron
+        # print('\t[SPIKE]\tReceived {} spikes in the last {} ms'.format(len(window), self.TIME_WINDOW))
+        return len(window)
 
 
 class SpikeSinkSmoothing(BasicSpikeSink):
     """
     Each incoming spike adds a fixed amount to the output value.
     Every 10 ms the output value is multiplied by 0.95.
+
+    A first-order IIR filter: spikes between two updates are only counted,
+    and the decayed sum is applied in closed form once per update tick, so
+    the per-spike cost is a single integer increment.
     """
     on_update_calling_rate = 10  # ms, defaults to 1 if undefined
-    ros_values = []
+
+    SPIKE_AMOUNT = 10
+    DECAY = 0.95
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ros_values = GrowableArray()
+        self._spike_count = 0
 
     def on_spike(self, spike_time, neuron_id, curr_ros_value):
-        new_ros_value = curr_ros_value + 10
+        self._spike_count += 1
+
+    def on_update(self, neurons, sim_time, curr_ros_value):
+        new_ros_value = (curr_ros_value + self.SPIKE_AMOUNT * self._spike_count) * self.DECAY
+        self._spike_count = 0
         self.ros_values.append(new_ros_value)
         return new_ros_value
 
+    def _plot(self):
+        import matplotlib.pyplot as plt
+        plt.plot(self.ros_values.data)
+        plt.title('ROS Values Over Time')
+        plt.show()
+
+
+class SpikeSinkSmoothingMulti(BasicSpikeSink):
+    """
+    Per-neuron version of SpikeSinkSmoothing.
+    Each incoming spike adds a fixed amount to the channel of its neuron.
+    Every 10 ms all channel values are multiplied by 0.95.
+    The ros output value is the sum over all channels.
+
+    The channel values live in one preallocated float32 array that is mutated
+    in place, so neither spikes nor updates allocate anything.
+    """
+    on_update_calling_rate = 10  # ms, defaults to 1 if undefined
+
+    # float32 constant so the in-place decay stays a single-precision SIMD
+    # multiply instead of being evaluated against a Python float each call
+    DECAY = np.float32(0.95)
+
+    def __init__(self, n_neurons, queue, timestep):
+        super().__init__(n_neurons, queue, timestep)
+        self._channel_values = np.zeros(n_neurons, dtype=np.float32)
+        self.ros_values = GrowableArray()
+
+    def on_spike(self, spike_time, neuron_id, curr_ros_value):
+        self._channel_values[neuron_id] += 10.0
+        return float(self._channel_values.sum())
+
     def on_update(self, neurons, sim_time, curr_ros_value):
-        new_ros_value = curr_ros_value * 0.95
+        np.multiply(self._channel_values, self.DECAY, out=self._channel_values)
+        new_ros_value = float(self._channel_values.sum())
         self.ros_values.append(new_ros_value)
         return new_ros_value
 
     def _plot(self):
         import matplotlib.pyplot as plt
-        plt.plot(self.ros_values)
+        plt.plot(self.ros_values.data)
         plt.title('ROS Values Over Time')
         plt.show()
 
@@ -198,23 +371,37 @@ class SpikeSinkSmoothing(BasicSpikeSink):
 class SpikeSinkConvolution(BasicSpikeSink):
     """
     Each spikes creates a spike response, which quickly increases and then slowly decreases.
-    Convolution / Summation of these functions produce a smoothed output value.
+    Summation of these responses produces a smoothed output value.
 
-    The function chosen for the spike response here is f(x) = 0.1*x*exp(2-x)
+    The function chosen for the spike response here is f(x) = x*exp(2-x), an alpha function.
+    Instead of convolving a sampled kernel on every spike, the summed response is kept as a
+    two-variable recurrence (V, I) whose impulse response is exactly that kernel:
+    each update costs two multiply-adds and each spike a single addition.
     """
     on_update_calling_rate = 10  # ms, defaults to 1 if undefined
 
-    spike_response = [i * np.exp(2 - i) for i in np.arange(0, 6, 0.1)]
-    output = [1 for i in range(len(spike_response))]
-    ros_values = []
+    dt = 0.1                 # kernel sample step per update
+    decay = np.exp(-dt)      # per-update decay of both state variables
+    gain = dt * np.exp(2)    # scales the recurrence to the kernel amplitude
+
+    spike_response = _alpha_kernel()  # kept for the plot
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ros_values = GrowableArray()
+        self._v = 0.0
+        self._i = 0.0
 
     def on_spike(self, spike_time, neuron_id, curr_ros_value):
-        self.output = np.convolve(self.output, self.spike_response, 'same')
+        self._i += 1.0
 
     def on_update(self, neurons, sim_time, curr_ros_value):
-        new_ros_value, self.output = self.output[0], np.append(self.output[1:], 1)  # FIFO
-        self.ros_values.append(new_ros_value)
-        return new_ros_value
+        # V_n = d*V_{n-1} + g*d*I_{n-1} and I_n = d*I_{n-1} (+1 per spike)
+        # reproduce sum_k (n-k)*dt * exp(2 - (n-k)*dt) over all spike times k.
+        self._v = self.decay * self._v + self.gain * self.decay * self._i
+        self._i *= self.decay
+        self.ros_values.append(self._v)
+        return self._v
 
     def plot(self):
         import matplotlib.pyplot as plt
@@ -225,7 +412,7 @@ class SpikeSinkConvolution(BasicSpikeSink):
         plt.title('Spike Response')
 
         plt.subplot(212)
-        plt.plot(self.ros_values)
+        plt.plot(self.ros_values.data)
         plt.title('ROS Values Over Time')
 
         plt.show()
@@ -239,29 +426,39 @@ class SpikeSinkConvolutionMultipleChannels(BasicSpikeSink):
     The function chosen for the spike response here is f(x) = x*exp(2-x)
 
     This class is the same as the SpikeSinkConvolution, but uses one output channel per neuron.
-    But there is still just one ros output, so the channels are combined to one output (Summation? Convolution?).
-
-    TODO complete
+    There is still just one ros output, so the channels are summed into it.
     """
     on_update_calling_rate = 10  # ms, defaults to 1 if undefined
 
-    spike_response = [i * np.exp(2 - i) for i in np.arange(0, 6, 0.1)]
-    output_ = [1 for _ in range(len(spike_response))]
-    output = []
-    for _ in range(10):
-        output.append(output_)
-    # output = [[1 for i in range(len(spike_response))] for n in range(10)]  # TODO get n_neurons dynamically #"souje_response is not difined error is occured?"
-    ros_values = []
+    spike_response = _alpha_kernel()
+
+    def __init__(self, n_neurons, queue, timestep):
+        super().__init__(n_neurons, queue, timestep)
+        self.ros_values = GrowableArray()
+        # One row per neuron, sized from n_neurons instead of a hard-coded
+        # count. The old class-level list-of-lists aliased one shared row for
+        # every neuron and on_spike convolved the whole ragged list; a 2-D
+        # float32 array gives every neuron its own contiguous row and makes
+        # the FIFO step a single column shift.
+        self.output = np.ones((n_neurons, len(self.spike_response)), dtype=np.float32)
+        # Ring-buffer head: column `_head` is the oldest (next outgoing) value,
+        # so the per-update FIFO step is O(1) instead of shifting every row.
+        self._head = 0
 
     def on_spike(self, spike_time, neuron_id, curr_ros_value):
-        self.output[neuron_id] = np.convolve(self.output, self.spike_response, 'same')
+        # Materialize the logically-rotated row only when a spike actually
+        # arrives; the per-update path never touches the kernel.
+        head = self._head
+        row = self.output[neuron_id]
+        logical = np.concatenate((row[head:], row[:head]))
+        logical = np.convolve(logical, self.spike_response, 'same')
+        row[head:] = logical[:row.size - head]
+        row[:head] = logical[row.size - head:]
 
     def on_update(self, neurons, sim_time, curr_ros_value):
-        values = []
-        for neuron in neurons:
-            v, self.output[neuron.key] = self.output[neuron.key][0], np.append(self.output[neuron.key][1:], 1)  # FIFO
-            values.append(v)
-        new_ros_value = sum(values)
+        head = self._head
+        new_ros_value = float(_column_tick(self.output, head, 1.0))  # FIFO read + refill
+        self._head = (head + 1) % self.output.shape[1]
         self.ros_values.append(new_ros_value)
         return new_ros_value
 